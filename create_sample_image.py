@@ -2,40 +2,75 @@
 """
 Create a sample license plate image for testing.
 """
+from functools import lru_cache
+
 import cv2
 import numpy as np
 from pathlib import Path
 
-# Create sample directory
-sample_dir = Path(__file__).parent / "samples"
-sample_dir.mkdir(exist_ok=True)
-
-# Create a sample image with a license plate
-width, height = 800, 600
-image = np.ones((height, width, 3), dtype=np.uint8) * 240  # Light gray background
-
-# Draw a car-like shape
-cv2.rectangle(image, (100, 200), (700, 450), (50, 50, 50), -1)  # Car body
-cv2.rectangle(image, (150, 150), (650, 200), (100, 100, 100), -1)  # Windshield
-
-# Draw license plate area
-plate_x, plate_y = 300, 350
-plate_w, plate_h = 200, 80
-cv2.rectangle(image, (plate_x, plate_y), (plate_x + plate_w, plate_y + plate_h), (255, 255, 255), -1)
-cv2.rectangle(image, (plate_x, plate_y), (plate_x + plate_w, plate_y + plate_h), (0, 0, 0), 3)
-
-# Add text "MH12AB1234" on the plate
-font = cv2.FONT_HERSHEY_SIMPLEX
-font_scale = 1.2
-thickness = 3
-text = "MH12AB1234"
-text_size = cv2.getTextSize(text, font, font_scale, thickness)[0]
-text_x = plate_x + (plate_w - text_size[0]) // 2
-text_y = plate_y + (plate_h + text_size[1]) // 2
-cv2.putText(image, text, (text_x, text_y), font, font_scale, (0, 0, 0), thickness)
-
-# Save the image
-output_path = sample_dir / "sample_license_plate.jpg"
-cv2.imwrite(str(output_path), image)
-print(f"Sample image created at: {output_path}")
-print(f"Image size: {width}x{height}")
+# Plate text rendering settings
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+FONT_SCALE = 1.2
+THICKNESS = 3
+
+
+@lru_cache(maxsize=8)
+def render_text(text: str):
+    """
+    Rasterize plate text once into a coverage mask.
+    
+    cv2.putText draws with the default LINE_8, so the mask is binary. Returns
+    the per-pixel text coverage (0.0 or 1.0, shape HxWx1) and the
+    position of the text origin (baseline left) inside it. The mask includes
+    a margin for the stroke thickness, so blending black text with it gives
+    the same pixels as drawing the text with cv2.putText in place.
+    """
+    (text_w, text_h), baseline = cv2.getTextSize(text, FONT, FONT_SCALE, THICKNESS)
+    margin = THICKNESS
+    canvas = np.zeros((text_h + baseline + 2 * margin, text_w + 2 * margin), dtype=np.uint8)
+    origin = (margin, margin + text_h)
+    cv2.putText(canvas, text, origin, FONT, FONT_SCALE, 255, THICKNESS)
+    coverage = (canvas.astype(np.float32) / 255.0)[..., np.newaxis]
+    coverage.flags.writeable = False  # Shared between calls
+    return coverage, origin
+
+
+def create_sample_image(output_path: Path, text: str = "MH12AB1234") -> np.ndarray:
+    """Create a sample image with a license plate and save it to output_path."""
+    width, height = 800, 600
+    image = np.full((height, width, 3), 240, dtype=np.uint8)  # Light gray background
+    
+    # Draw a car-like shape (filled rectangles are plain slice assignments;
+    # cv2.rectangle end points are inclusive, hence the +1)
+    image[200:451, 100:701] = (50, 50, 50)  # Car body
+    image[150:201, 150:651] = (100, 100, 100)  # Windshield
+    
+    # Draw license plate area
+    plate_x, plate_y = 300, 350
+    plate_w, plate_h = 200, 80
+    image[plate_y:plate_y + plate_h + 1, plate_x:plate_x + plate_w + 1] = (255, 255, 255)
+    cv2.rectangle(image, (plate_x, plate_y), (plate_x + plate_w, plate_y + plate_h), (0, 0, 0), 3)
+    
+    # Add black text centered on the plate by blending the cached glyphs
+    text_size = cv2.getTextSize(text, FONT, FONT_SCALE, THICKNESS)[0]
+    text_x = plate_x + (plate_w - text_size[0]) // 2
+    text_y = plate_y + (plate_h + text_size[1]) // 2
+    coverage, (origin_x, origin_y) = render_text(text)
+    top, left = text_y - origin_y, text_x - origin_x
+    region = image[top:top + coverage.shape[0], left:left + coverage.shape[1]]
+    region[:] = np.rint(region * (1.0 - coverage))
+    
+    # Save the image
+    cv2.imwrite(str(output_path), image)
+    return image
+
+
+if __name__ == "__main__":
+    # Create sample directory
+    sample_dir = Path(__file__).parent / "samples"
+    sample_dir.mkdir(exist_ok=True)
+    
+    output_path = sample_dir / "sample_license_plate.jpg"
+    image = create_sample_image(output_path)
+    print(f"Sample image created at: {output_path}")
+    print(f"Image size: {image.shape[1]}x{image.shape[0]}")
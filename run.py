@@ -16,14 +16,30 @@ if str(project_root) not in sys.path:
 # Load environment variables
 load_dotenv()
 
+# First file descriptor passed by systemd socket activation (SD_LISTEN_FDS_START)
+LISTEN_FDS_START = 3
+
 if __name__ == "__main__":
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", 8000))
     
+    # Auto-reload on code changes is opt-in (RELOAD=true) for development;
+    # it runs a file watcher and cannot be combined with multiple workers
+    reload = os.getenv("RELOAD", "false").lower() == "true"
+    workers = 1 if reload else int(os.getenv("WORKERS", 1))
+    
+    # Serve on a pre-bound socket when started via systemd socket activation;
+    # uvicorn then ignores host/port and all workers share the socket
+    fd = None
+    if int(os.getenv("LISTEN_FDS", 0)) > 0 and os.getenv("LISTEN_PID") == str(os.getpid()):
+        fd = LISTEN_FDS_START
+    
     uvicorn.run(
         "src.backend.main:app",
         host=host,
         port=port,
-        reload=True,  # Auto-reload on code changes for development
+        fd=fd,
+        reload=reload,
+        workers=workers,
         log_level="info"
     )
@@ -6,15 +6,19 @@ Populates the database with dummy data for frontend demonstration.
 import os
 import sys
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
 import random
 
+import numpy as np
+
 # Add project root to Python path
 project_root = Path(__file__).parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from dotenv import load_dotenv
+from sqlalchemy import insert, select
+
 from src.database import get_db_session, init_db
 from src.database.models import Vehicle, Detection, Event
 from utils.logger import logger
@@ -22,7 +26,6 @@ from utils.logger import logger
 # Load environment variables
 load_dotenv()
 
-
 def create_sample_vehicles(db):
     """Create sample vehicles."""
     vehicles_data = [
@@ -92,23 +95,27 @@ def create_sample_vehicles(db):
         }
     ]
     
-    vehicles = []
+    # Check which vehicles already exist in a single query
+    plates = [data["plate_number"] for data in vehicles_data]
+    existing = set(db.scalars(
+        select(Vehicle.plate_number).where(Vehicle.plate_number.in_(plates))
+    ).all())
+    
+    new_rows = []
     for data in vehicles_data:
-        # Check if vehicle already exists
-        existing = db.query(Vehicle).filter(
-            Vehicle.plate_number == data["plate_number"]
-        ).first()
-        
-        if not existing:
-            vehicle = Vehicle(**data)
-            db.add(vehicle)
-            vehicles.append(vehicle)
+        if data["plate_number"] not in existing:
+            new_rows.append(data)
             logger.info(f"Created vehicle: {data['plate_number']}")
         else:
-            vehicles.append(existing)
             logger.info(f"Vehicle already exists: {data['plate_number']}")
     
-    db.commit()
+    if new_rows:
+        db.execute(insert(Vehicle), new_rows)
+    
+    # Reload all seeded vehicles (new and existing) in one query
+    vehicles = db.scalars(
+        select(Vehicle).where(Vehicle.plate_number.in_(plates))
+    ).all()
     return vehicles
 
 
@@ -118,39 +125,53 @@ def create_sample_detections(db, vehicles):
     
     # Generate detections for the last 7 days
     base_time = datetime.utcnow()
+    count = 50  # Create 50 detections
     
-    for i in range(50):  # Create 50 detections
-        # Random vehicle
-        vehicle = random.choice(vehicles)
-        
-        # Random time in the last 7 days
-        hours_ago = random.randint(0, 168)  # 7 days = 168 hours
-        detection_time = base_time - timedelta(hours=hours_ago)
-        
-        # Random bounding box (simulated)
-        x1 = random.randint(100, 400)
-        y1 = random.randint(150, 350)
-        x2 = x1 + random.randint(150, 250)
-        y2 = y1 + random.randint(40, 80)
-        
-        # Confidence between 0.75 and 0.99
-        confidence = round(random.uniform(0.75, 0.99), 2)
-        
-        detection = Detection(
-            vehicle_id=vehicle.id,
-            plate_text=vehicle.plate_number,
-            confidence=confidence,
-            bbox_x1=x1,
-            bbox_y1=y1,
-            bbox_x2=x2,
-            bbox_y2=y2,
-            timestamp=detection_time
-        )
+    # Draw all random values up front, one vectorized call per field
+    rng = np.random.default_rng()
+    vehicle_indices = rng.integers(0, len(vehicles), count).tolist()  # Random vehicle
+    # 7 days = 168 hours; sorted oldest first so rows (and their IDs) are
+    # already in timestamp order for the event phase
+    hours_ago = np.sort(rng.integers(0, 169, count))[::-1]
+    timestamps = (
+        np.datetime64(base_time, "us") - hours_ago.astype("timedelta64[h]")
+    ).tolist()  # datetime64[us] converts back to datetime objects
+    
+    # Random bounding box (simulated)
+    x1s = rng.integers(100, 401, count)
+    y1s = rng.integers(150, 351, count)
+    x2s = x1s + rng.integers(150, 251, count)
+    y2s = y1s + rng.integers(40, 81, count)
+    
+    # Confidence between 0.75 and 0.99
+    confidences = np.round(rng.uniform(0.75, 0.99, count), 2).tolist()
+    
+    for vehicle_index, detection_time, x1, y1, x2, y2, confidence in zip(
+        vehicle_indices, timestamps,
+        x1s.tolist(), y1s.tolist(), x2s.tolist(), y2s.tolist(),
+        confidences
+    ):
+        vehicle = vehicles[vehicle_index]
         
-        db.add(detection)
-        detections_data.append(detection)
+        detections_data.append({
+            "vehicle_id": vehicle.id,
+            "plate_text": vehicle.plate_number,
+            "confidence": confidence,
+            "bbox_x1": x1,
+            "bbox_y1": y1,
+            "bbox_x2": x2,
+            "bbox_y2": y2,
+            "timestamp": detection_time
+        })
+    
+    # Insert all detections in one batch, reading back IDs in row order
+    detection_ids = db.scalars(
+        insert(Detection).returning(Detection.id, sort_by_parameter_order=True),
+        detections_data
+    ).all()
+    for detection, detection_id in zip(detections_data, detection_ids):
+        detection["id"] = detection_id
     
-    db.commit()
     logger.info(f"Created {len(detections_data)} detections")
     return detections_data
 
@@ -159,13 +180,11 @@ def create_sample_events(db, vehicles, detections):
     """Create sample events."""
     events_data = []
     
-    # Map detections to their vehicles
-    detection_map = {d.id: d for d in detections}
+    # Map vehicle IDs to the vehicles already loaded
+    vehicles_by_id = {v.id: v for v in vehicles}
     
     for detection in detections:
-        vehicle = db.query(Vehicle).filter(
-            Vehicle.id == detection.vehicle_id
-        ).first()
+        vehicle = vehicles_by_id.get(detection["vehicle_id"])
         
         if not vehicle:
             continue
@@ -190,19 +209,17 @@ def create_sample_events(db, vehicles, detections):
                 rule_name = "normal_entry"
                 description = f"Vehicle allowed: {vehicle.plate_number}"
         
-        event = Event(
-            vehicle_id=vehicle.id,
-            detection_id=detection.id,
-            event_type=event_type,
-            description=description,
-            rule_name=rule_name,
-            timestamp=detection.timestamp
-        )
-        
-        db.add(event)
-        events_data.append(event)
+        events_data.append({
+            "vehicle_id": vehicle.id,
+            "detection_id": detection["id"],
+            "event_type": event_type,
+            "description": description,
+            "rule_name": rule_name,
+            "timestamp": detection["timestamp"]
+        })
     
-    db.commit()
+    if events_data:
+        db.execute(insert(Event), events_data)
     logger.info(f"Created {len(events_data)} events")
     return events_data
 
@@ -222,20 +239,22 @@ def main():
         db = get_db_session()
         
         try:
-            # Create vehicles
-            print("\n2. Creating sample vehicles...")
-            vehicles = create_sample_vehicles(db)
-            print(f"   ✅ Created/found {len(vehicles)} vehicles")
-            
-            # Create detections
-            print("\n3. Creating sample detections...")
-            detections = create_sample_detections(db, vehicles)
-            print(f"   ✅ Created {len(detections)} detections")
-            
-            # Create events
-            print("\n4. Creating sample events...")
-            events = create_sample_events(db, vehicles, detections)
-            print(f"   ✅ Created {len(events)} events")
+            # Seed everything in a single transaction (one commit)
+            with db.begin():
+                # Create vehicles
+                print("\n2. Creating sample vehicles...")
+                vehicles = create_sample_vehicles(db)
+                print(f"   ✅ Created/found {len(vehicles)} vehicles")
+                
+                # Create detections
+                print("\n3. Creating sample detections...")
+                detections = create_sample_detections(db, vehicles)
+                print(f"   ✅ Created {len(detections)} detections")
+                
+                # Create events
+                print("\n4. Creating sample events...")
+                events = create_sample_events(db, vehicles, detections)
+                print(f"   ✅ Created {len(events)} events")
             
             # Summary
             print("\n" + "=" * 60)
@@ -245,9 +264,9 @@ def main():
             print(f"  - Vehicles: {len(vehicles)}")
             print(f"  - Detections: {len(detections)}")
             print(f"  - Events: {len(events)}")
-            print(f"\n  - ALLOW events: {sum(1 for e in events if e.event_type == 'ALLOW')}")
-            print(f"  - ALERT events: {sum(1 for e in events if e.event_type == 'ALERT')}")
-            print(f"  - LOG_ONLY events: {sum(1 for e in events if e.event_type == 'LOG_ONLY')}")
+            print(f"\n  - ALLOW events: {sum(1 for e in events if e['event_type'] == 'ALLOW')}")
+            print(f"  - ALERT events: {sum(1 for e in events if e['event_type'] == 'ALERT')}")
+            print(f"  - LOG_ONLY events: {sum(1 for e in events if e['event_type'] == 'LOG_ONLY')}")
             print("\nYou can now view this data in the frontend application!")
             
         finally:
@@ -3,12 +3,31 @@ Event Agent - Rule-based event decision making.
 Determines actions (ALLOW, ALERT, LOG_ONLY) based on rules.
 """
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Optional
 
 from utils.logger import logger
 
 
+@lru_cache(maxsize=8)
+def _read_rules(path: str, mtime: float) -> Dict:
+    """
+    Parse a rules JSON file.
+    
+    Cached per (path, mtime) so repeated agent construction skips file I/O
+    and parsing, while edits to the file are still picked up. The result is
+    shared between agents, so its collections are made immutable.
+    """
+    with open(path, 'r') as f:
+        rules = json.load(f)
+    rules["event_rules"] = tuple(rules.get("event_rules", []))
+    # Plate lists are only used for membership tests
+    rules["blacklisted_plates"] = frozenset(rules.get("blacklisted_plates", []))
+    rules["authorized_plates"] = frozenset(rules.get("authorized_plates", []))
+    return rules
+
+
 class EventAgent:
     """Agent responsible for making event decisions based on rules."""
     
@@ -24,29 +43,32 @@ class EventAgent:
         
         self.rules_path = Path(rules_path)
         self.rules = self._load_rules()
+        self.blacklisted_plates = self.rules["blacklisted_plates"]
+        self.authorized_plates = self.rules["authorized_plates"]
         logger.info("Event agent initialized")
     
     def _load_rules(self) -> Dict:
         """Load rules from JSON file."""
         try:
             if self.rules_path.exists():
-                with open(self.rules_path, 'r') as f:
-                    rules = json.load(f)
+                rules = dict(_read_rules(
+                    str(self.rules_path), self.rules_path.stat().st_mtime
+                ))
                 logger.info(f"Rules loaded from {self.rules_path}")
                 return rules
             else:
                 logger.warning(f"Rules file not found: {self.rules_path}, using defaults")
                 return {
                     "event_rules": [],
-                    "blacklisted_plates": [],
-                    "authorized_plates": []
+                    "blacklisted_plates": frozenset(),
+                    "authorized_plates": frozenset()
                 }
         except Exception as e:
             logger.error(f"Error loading rules: {e}")
             return {
                 "event_rules": [],
-                "blacklisted_plates": [],
-                "authorized_plates": []
+                "blacklisted_plates": frozenset(),
+                "authorized_plates": frozenset()
             }
     
     def decide(self, plate_text: str, is_valid: bool, vehicle_info: Optional[Dict] = None) -> Dict:
@@ -71,8 +93,7 @@ class EventAgent:
                 }
             
             # Check blacklisted plates
-            blacklisted = self.rules.get("blacklisted_plates", [])
-            if plate_text in blacklisted or (vehicle_info and vehicle_info.get("is_blacklisted")):
+            if plate_text in self.blacklisted_plates or (vehicle_info and vehicle_info.get("is_blacklisted")):
                 return {
                     "action": "ALERT",
                     "rule_name": "blacklisted_vehicle",
@@ -80,9 +101,8 @@ class EventAgent:
                 }
             
             # Check authorized plates (if applicable)
-            authorized = self.rules.get("authorized_plates", [])
-            if authorized:  # Only if authorization list is defined
-                if plate_text not in authorized and (not vehicle_info or not vehicle_info.get("is_authorized")):
+            if self.authorized_plates:  # Only if authorization list is defined
+                if plate_text not in self.authorized_plates and (not vehicle_info or not vehicle_info.get("is_authorized")):
                     return {
                         "action": "ALERT",
                         "rule_name": "unauthorized_entry",
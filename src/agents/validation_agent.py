@@ -3,6 +3,7 @@ Validation Agent - Regex-based validation of Indian number plates.
 Validates license plate formats without ML.
 """
 import re
+import string
 from typing import Dict, Optional
 
 from utils.logger import logger
@@ -11,24 +12,30 @@ from utils.logger import logger
 class ValidationAgent:
     """Agent responsible for validating license plate formats."""
     
-    # Indian number plate patterns
-    # Format: XX##XX#### or XX##X#### (e.g., MH12AB1234, DL01A2345)
-    PATTERNS = [
-        # Standard format: State Code (2 letters) + District Code (2 digits) + Series (1-2 letters) + Number (1-4 digits)
-        re.compile(r'^[A-Z]{2}\d{2}[A-Z]{1,2}\d{1,4}$'),
-        # Alternative format with spaces: XX ## XX ####
-        re.compile(r'^[A-Z]{2}\s?\d{2}\s?[A-Z]{1,2}\s?\d{1,4}$'),
-        # Older format variations
-        re.compile(r'^[A-Z]{2}\d{1,2}[A-Z]{1,2}\d{1,4}$'),
-    ]
-    
     # Indian state codes (first 2 letters)
-    STATE_CODES = [
+    STATE_CODES = frozenset({
         'AP', 'AR', 'AS', 'BR', 'CG', 'CH', 'DD', 'DH', 'DL', 'GA', 'GJ', 'HP',
         'HR', 'JH', 'JK', 'KA', 'KL', 'LA', 'LD', 'MH', 'ML', 'MN', 'MP', 'MZ',
         'NL', 'OR', 'PB', 'PY', 'RJ', 'SK', 'TN', 'TR', 'TS', 'UK', 'UP', 'WB',
-        'AN', 'DN', 'DD'
-    ]
+        'AN', 'DN'
+    })
+    
+    # Indian number plate format (input is stripped of spaces/dashes first)
+    # Format: XX##XX#### or XX##X#### (e.g., MH12AB1234, DL01A2345)
+    # State Code (2 letters) + District Code (1-2 digits) + Series (1-2 letters) + Number (1-4 digits)
+    FORMAT_PATTERN = re.compile(r'[A-Z]{2}\d{1,2}[A-Z]{1,2}\d{1,4}', re.ASCII)
+    
+    # Same format with the state code folded in, so a valid plate needs one match
+    PLATE_PATTERN = re.compile(
+        r'(?:' + '|'.join(sorted(STATE_CODES)) + r')\d{1,2}[A-Z]{1,2}\d{1,4}',
+        re.ASCII
+    )
+    
+    # Removes spaces/dashes/whitespace and upper-cases letters in a single pass
+    CLEAN_TABLE = str.maketrans({
+        **{c: None for c in " -\t\n\r"},
+        **{c: c.upper() for c in string.ascii_lowercase},
+    })
     
     def __init__(self):
         """Initialize validation agent."""
@@ -46,7 +53,7 @@ class ValidationAgent:
         """
         try:
             # Clean input text
-            cleaned_text = plate_text.replace(" ", "").replace("-", "").upper().strip()
+            cleaned_text = plate_text.translate(self.CLEAN_TABLE)
             
             if not cleaned_text:
                 return {
@@ -55,30 +62,20 @@ class ValidationAgent:
                     "message": "Empty plate text"
                 }
             
-            # Check against patterns
-            matches_pattern = False
-            for pattern in self.PATTERNS:
-                if pattern.match(cleaned_text):
-                    matches_pattern = True
-                    break
-            
-            if not matches_pattern:
+            # Check format and state code in a single match
+            if not self.PLATE_PATTERN.fullmatch(cleaned_text):
+                if self.FORMAT_PATTERN.fullmatch(cleaned_text):
+                    return {
+                        "is_valid": False,
+                        "normalized_text": cleaned_text,
+                        "message": f"Invalid state code: {cleaned_text[:2]}"
+                    }
                 return {
                     "is_valid": False,
                     "normalized_text": cleaned_text,
                     "message": "Plate format does not match Indian number plate patterns"
                 }
             
-            # Check state code (first 2 characters)
-            if len(cleaned_text) >= 2:
-                state_code = cleaned_text[:2]
-                if state_code not in self.STATE_CODES:
-                    return {
-                        "is_valid": False,
-                        "normalized_text": cleaned_text,
-                        "message": f"Invalid state code: {state_code}"
-                    }
-            
             # Valid plate
             logger.debug(f"Plate validated: {cleaned_text}")
             return {
@@ -2,8 +2,9 @@
 Vision Agent - Handles detection and OCR.
 Combines plate detection and OCR to extract plate text.
 """
+import os
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 import cv2
 
@@ -20,9 +21,12 @@ class VisionAgent:
         try:
             self.detector = PlateDetector()
             self.ocr_engine = OCREngine()
+            # Frames smaller than this (shorter side, px) are treated as plate
+            # crops and sent straight to OCR, skipping the detector pass
+            self.skip_detector_below = int(os.getenv("SKIP_DETECTOR_BELOW", 320))
             logger.info("Vision agent initialized successfully")
         except Exception as e:
-            logger.error(f"Error initializing vision agent: {e}")
+            logger.error("Error initializing vision agent: %s", e)
             raise
     
     def process_frame(self, frame: np.ndarray) -> Optional[Dict]:
@@ -33,48 +37,139 @@ class VisionAgent:
             frame: Input frame as NumPy array (BGR format)
         
         Returns:
-            Dictionary with plate_text, confidence, bbox, and timestamp.
+            Dictionary with plate_text, confidence, bbox, and timestamp (UTC datetime).
             Returns None if no plate detected or OCR fails.
         """
         try:
-            # Detect license plates
-            detections = self.detector.detect(frame)
-            
-            if not detections:
-                return None
-            
-            # Use the detection with highest confidence
-            best_detection = max(detections, key=lambda x: x[4])
-            x1, y1, x2, y2, detection_confidence = best_detection
-            
-            # Crop the license plate region
-            plate_roi = frame[y1:y2, x1:x2]
-            
-            if plate_roi.size == 0:
-                logger.warning("Empty ROI after cropping")
+            plate = self._locate_plate(frame)
+            if plate is None:
                 return None
             
-            # Perform OCR on cropped region
+            plate_roi, detection_confidence, bbox = plate
             plate_text, ocr_confidence = self.ocr_engine.read_text(plate_roi)
-            
-            if plate_text is None:
-                logger.debug("OCR failed to extract text")
-                return None
-            
-            # Calculate combined confidence
-            combined_confidence = (detection_confidence + ocr_confidence) / 2.0
-            
-            # Format output according to specification
-            result = {
-                "plate_text": plate_text,
-                "confidence": combined_confidence,
-                "bbox": [x1, y1, x2, y2],
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
-            logger.info(f"Plate detected: {plate_text} (confidence: {combined_confidence:.2f})")
-            return result
+            return self._build_result(plate_text, ocr_confidence, detection_confidence, bbox)
             
         except Exception as e:
-            logger.error(f"Error in vision agent processing: {e}")
+            logger.error("Error in vision agent processing: %s", e)
+            return None
+    
+    def process_frames(self, frames: List[np.ndarray]) -> List[Optional[Dict]]:
+        """
+        Process several frames, detecting plates in all of them with one
+        batched detector call and reading same-shaped plates in batched OCR calls.
+        
+        Args:
+            frames: Input frames as NumPy arrays (BGR format)
+        
+        Returns:
+            One result per frame, in order (same format as process_frame;
+            None where no plate was detected or OCR failed).
+        """
+        is_crop = [self._is_plate_crop(frame) for frame in frames]
+        batch_detections = iter(self.detector.detect_batch(
+            [frame for frame, crop in zip(frames, is_crop) if not crop],
+            max_det=1
+        ))
+        
+        # Locate the plate in every frame first: (frame index, plate)
+        plates = []
+        for index, (frame, crop) in enumerate(zip(frames, is_crop)):
+            try:
+                detections = None if crop else next(batch_detections)
+                plate = self._locate_plate(frame, detections)
+                if plate is not None:
+                    plates.append((index, plate))
+            except Exception as e:
+                logger.error("Error in vision agent processing: %s", e)
+        
+        ocr_results = self.ocr_engine.read_text_batch(
+            [plate_roi for _, (plate_roi, _, _) in plates]
+        )
+        
+        results = [None] * len(frames)
+        for (index, plate), (plate_text, ocr_confidence) in zip(plates, ocr_results):
+            _, detection_confidence, bbox = plate
+            results[index] = self._build_result(
+                plate_text, ocr_confidence, detection_confidence, bbox
+            )
+        
+        return results
+    
+    def _is_plate_crop(self, frame: np.ndarray) -> bool:
+        """Whether a frame is small enough to skip detection and OCR it whole."""
+        return min(frame.shape[:2]) < self.skip_detector_below
+    
+    def _locate_plate(
+        self,
+        frame: np.ndarray,
+        detections: Optional[List[Tuple[int, int, int, int, float]]] = None
+    ) -> Optional[Tuple[np.ndarray, Optional[float], List[int]]]:
+        """
+        Find the plate region to read in a frame.
+        
+        Frames that are already plate crops are used whole. Otherwise the most
+        confident detection is cropped out; detections are computed here
+        unless given (e.g. from a batched detector call).
+        
+        Returns:
+            Tuple of (plate ROI, detection confidence or None for plate crops,
+            bbox), or None if no plate was found.
+        """
+        h, w = frame.shape[:2]
+        if self._is_plate_crop(frame):
+            return frame, None, [0, 0, w, h]
+        
+        if detections is None:
+            # Only the most confident box is read, so NMS keeps just that one
+            detections = self.detector.detect(frame, max_det=1)
+        if not detections:
+            return None
+        
+        # Use the detection with highest confidence
+        best_detection = max(detections, key=lambda x: x[4])
+        x1, y1, x2, y2, detection_confidence = best_detection
+        
+        # Clamp the box to the frame in one call (negative indices would
+        # otherwise wrap around when slicing)
+        x1, y1, x2, y2 = np.clip([x1, y1, x2, y2], 0, [w, h, w, h]).tolist()
+        
+        # Crop the license plate region
+        plate_roi = frame[y1:y2, x1:x2]
+        
+        if plate_roi.size == 0:
+            logger.warning("Empty ROI after cropping")
+            return None
+        
+        return plate_roi, detection_confidence, [x1, y1, x2, y2]
+    
+    def _build_result(
+        self,
+        plate_text: Optional[str],
+        ocr_confidence: float,
+        detection_confidence: Optional[float],
+        bbox: List[int]
+    ) -> Optional[Dict]:
+        """Turn an OCR reading of a located plate into a result (None if OCR failed)."""
+        if plate_text is None:
+            logger.debug("OCR failed to extract text")
             return None
+        
+        if detection_confidence is None:
+            confidence = ocr_confidence
+        else:
+            # Calculate combined confidence
+            confidence = (detection_confidence + ocr_confidence) / 2.0
+        
+        return self._format_result(plate_text, confidence, bbox)
+    
+    def _format_result(self, plate_text: str, confidence: float, bbox: List[int]) -> Dict:
+        """Format output according to specification."""
+        result = {
+            "plate_text": plate_text,
+            "confidence": confidence,
+            "bbox": bbox,
+            "timestamp": datetime.utcnow()
+        }
+        
+        logger.info("Plate detected: %s (confidence: %.2f)", plate_text, confidence)
+        return result
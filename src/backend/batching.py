@@ -0,0 +1,146 @@
+"""
+Micro-batching of frames from concurrent detection requests.
+Groups frames that arrive close together into a single vision agent call.
+"""
+import asyncio
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import logger
+
+# Default batching window; a longer wait forms fuller batches at the cost
+# of added latency for the first request in each batch
+MAX_BATCH = int(os.getenv("BATCH_MAX_SIZE", 8))
+MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", 5))
+
+
+class FrameBatcher:
+    """
+    Queue that collects frames from concurrent requests and processes them
+    in batches.
+    
+    A single worker task drains the queue: it waits for a first frame, then
+    collects more until the batch is full or the wait window expires, and
+    hands the batch to process_batch in a worker thread. Model calls are
+    therefore also serialized, as the detector is not safe for concurrent use.
+    """
+    
+    def __init__(
+        self,
+        process_batch: Callable[[List[np.ndarray]], List[Optional[Dict]]],
+        max_batch: int = MAX_BATCH,
+        max_wait_ms: float = MAX_WAIT_MS
+    ):
+        """
+        Initialize the batcher.
+        
+        Args:
+            process_batch: Blocking function mapping a list of frames to one
+                result per frame (e.g. VisionAgent.process_frames)
+            max_batch: Maximum number of frames per batch
+            max_wait_ms: Maximum time to wait for more frames after the first
+        """
+        self.process_batch = process_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Frames taken off the queue and not yet resolved
+        self._batch: List[Tuple[np.ndarray, asyncio.Future]] = []
+    
+    async def submit(self, frame: np.ndarray) -> Optional[Dict]:
+        """
+        Queue a frame and wait for its result.
+        
+        Args:
+            frame: Input frame as NumPy array (BGR format)
+        
+        Returns:
+            The result of process_batch for this frame
+        """
+        if self._queue is None:
+            # Created lazily so it binds to the running event loop
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            # First call, or the worker died: (re)start it so queued frames
+            # are not left waiting forever
+            self._fail_batch(RuntimeError("Frame batch worker stopped"))
+            self._worker = asyncio.create_task(self._run())
+            self._worker.add_done_callback(self._on_worker_done)
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((frame, future))
+        return await future
+    
+    async def stop(self):
+        """Stop the worker task and fail any frames still waiting for a result."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        
+        error = RuntimeError("Frame batcher stopped")
+        self._fail_batch(error)
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(error)
+            self._queue = None
+    
+    def _fail_batch(self, error: Exception):
+        """Fail the futures of the in-flight batch (those not yet resolved)."""
+        for _, future in self._batch:
+            if not future.done():
+                future.set_exception(error)
+        self._batch = []
+    
+    def _on_worker_done(self, task: asyncio.Task):
+        """Log an unexpected worker exit and fail the batch it was processing."""
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error("Frame batch worker died: %s", error)
+            self._fail_batch(error)
+    
+    async def _run(self):
+        """Worker loop: collect a batch, process it, resolve the futures."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            self._batch = batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            frames = [frame for frame, _ in batch]
+            try:
+                results = await asyncio.to_thread(self.process_batch, frames)
+                if results is None or len(results) != len(batch):
+                    raise RuntimeError(
+                        f"process_batch returned {0 if results is None else len(results)} "
+                        f"results for {len(batch)} frames"
+                    )
+            except Exception as e:
+                logger.error("Error processing frame batch: %s", e)
+                self._fail_batch(e)
+                continue
+            
+            for (_, future), result in zip(batch, results):
+                # Skip requests that were cancelled while waiting
+                if not future.done():
+                    future.set_result(result)
+            self._batch = []
@@ -2,18 +2,39 @@
 FastAPI application main file.
 Entry point for the ANPR backend API.
 """
+import os
+
+import cv2
+import numpy as np
+import torch
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-from src.backend.routes import router
+from src.backend.routes import (
+    router,
+    get_vision_agent,
+    get_validation_agent,
+    get_event_agent,
+    get_frame_batcher,
+    close_http_client
+)
 from src.database import init_db
 from utils.logger import logger
 
+def get_cpu_count() -> int:
+    """Number of CPUs this process may run on (respects CPU affinity/cpusets)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
 # Create FastAPI app
 app = FastAPI(
     title="ANPR System API",
     description="Automatic Number Plate Recognition System API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # Faster JSON encoding (orjson)
 )
 
 # Configure CORS for Angular frontend
@@ -31,14 +52,46 @@ app.include_router(router, prefix="/api", tags=["anpr"])
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup."""
+    """Initialize database and agents on startup."""
     try:
         init_db()
+        
+        # Match OpenCV's thread pool to the CPUs actually available, so
+        # containers with a CPU limit are not oversubscribed
+        cv2.setNumThreads(int(os.getenv("OPENCV_THREADS", get_cpu_count())))
+        
+        # Optionally cap PyTorch's intra-op threads (YOLO and EasyOCR share
+        # them); by default PyTorch uses one per physical core
+        torch_threads = os.getenv("TORCH_THREADS")
+        if torch_threads:
+            torch.set_num_threads(int(torch_threads))
+        
+        # Create all agents before serving, so model loading happens once
+        # here rather than inside the first /detect request
+        vision_agent = get_vision_agent()
+        get_validation_agent()
+        get_event_agent()
+        
+        # Optionally run a dummy frame through the models as well, so the
+        # first real request doesn't pay the kernel warm-up cost either
+        if os.getenv("WARMUP", "false").lower() == "true":
+            vision_agent.process_frame(np.zeros((640, 640, 3), dtype=np.uint8))
+            # A blank frame yields no plate, so OCR is warmed up explicitly
+            vision_agent.ocr_engine.warmup()
+            logger.info("Vision agent warmed up")
+        
         logger.info("ANPR API started successfully")
     except Exception as e:
         logger.error(f"Error during startup: {e}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers and close shared clients on shutdown."""
+    await get_frame_batcher().stop()
+    await close_http_client()
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -2,20 +2,23 @@
 FastAPI routes for ANPR system.
 Handles all API endpoints.
 """
-from typing import List, Optional
+import asyncio
+import os
+import threading
+from typing import Dict, List, Optional, Union
 from datetime import datetime, timedelta
 from pathlib import Path
 import cv2
+import httpx
 import numpy as np
-import requests
 from io import BytesIO
 
 from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, insert
 
-from src.database import get_db, Detection, Event, Vehicle
+from src.database import get_db, lookup_vehicle, Detection, Event
 from src.backend.schemas import (
     DetectionResponse,
     DetectionCreate,
@@ -24,12 +27,108 @@ from src.backend.schemas import (
     DetectionRequest
 )
 from src.agents import VisionAgent, ValidationAgent, EventAgent
+from src.backend.batching import FrameBatcher
 from utils.logger import logger
 
+try:
+    # Optional: libjpeg-turbo based JPEG decoder, faster than cv2.imdecode
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
 router = APIRouter()
 
+# Leading bytes (SOI marker) of every JPEG file
+JPEG_MAGIC = b"\xff\xd8\xff"
+
+# EXIF tag holding the image orientation (1 = upright)
+EXIF_ORIENTATION_TAG = 0x0112
+
+# Largest accepted image upload, in bytes
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", 20)) * 1024 * 1024
+
+# Shared HTTP client, so image URL fetches reuse pooled (HTTP/2) connections
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP client."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(http2=True, timeout=10.0, follow_redirects=True)
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client and its connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
-def load_image(image_url: Optional[str]) -> np.ndarray:
+def jpeg_orientation(data: Union[bytes, bytearray]) -> int:
+    """
+    Read the EXIF Orientation tag of a JPEG.
+    
+    Args:
+        data: Encoded JPEG file contents (bytes or bytearray)
+    
+    Returns:
+        The orientation value (1-8), or 1 when the tag is missing or unreadable
+    """
+    # Walk the marker segments up to the start of scan, looking for APP1 Exif
+    pos = 2
+    while pos + 4 <= len(data) and data[pos] == 0xFF:
+        marker = data[pos + 1]
+        if marker == 0xDA:
+            break
+        length = int.from_bytes(data[pos + 2:pos + 4], "big")
+        if marker == 0xE1 and data[pos + 4:pos + 10] == b"Exif\0\0":
+            tiff = bytes(data[pos + 10:pos + 2 + length])
+            order = {b"II": "little", b"MM": "big"}.get(tiff[:2])
+            if order is None:
+                return 1
+            
+            # Scan the 12-byte entries of IFD0 for the Orientation tag
+            ifd = int.from_bytes(tiff[4:8], order)
+            count = int.from_bytes(tiff[ifd:ifd + 2], order)
+            for entry in range(ifd + 2, ifd + 2 + 12 * count, 12):
+                if entry + 12 > len(tiff):
+                    break
+                if int.from_bytes(tiff[entry:entry + 2], order) == EXIF_ORIENTATION_TAG:
+                    return int.from_bytes(tiff[entry + 8:entry + 10], order)
+            return 1
+        pos += 2 + length
+    
+    return 1
+
+
+def decode_image(data: Union[bytes, bytearray]) -> Optional[np.ndarray]:
+    """
+    Decode encoded image bytes into a BGR frame.
+    
+    JPEGs are decoded with simplejpeg when it is installed; other formats,
+    JPEGs it rejects and JPEGs with an EXIF rotation go through cv2.imdecode,
+    which applies the orientation (simplejpeg ignores it).
+    
+    Args:
+        data: Encoded image file contents (bytes or bytearray)
+    
+    Returns:
+        NumPy array representing the image (BGR format), or None if the data
+        could not be decoded
+    """
+    if simplejpeg is not None and data[:3] == JPEG_MAGIC and jpeg_orientation(data) == 1:
+        try:
+            return simplejpeg.decode_jpeg(data, colorspace="BGR")
+        except ValueError:
+            pass
+    
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)  # Zero-copy view
+
+
+async def load_image(image_url: Optional[str]) -> np.ndarray:
     """
     Load an image from URL or file path.
     
@@ -45,34 +144,47 @@ def load_image(image_url: Optional[str]) -> np.ndarray:
     try:
         # Try to load from URL
         if image_url.startswith(('http://', 'https://')):
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-            image_data = np.frombuffer(response.content, np.uint8)
-            frame = cv2.imdecode(image_data, cv2.IMREAD_COLOR)
+            # Stream the body into one buffer, stopping at the upload limit
+            data = bytearray()
+            async with get_http_client().stream("GET", image_url) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    data += chunk
+                    if len(data) > MAX_UPLOAD_BYTES:
+                        raise HTTPException(status_code=413, detail="Image file too large")
+            frame = await asyncio.to_thread(decode_image, data)
         else:
             # Load from file path
-            frame = cv2.imread(image_url)
+            frame = await asyncio.to_thread(cv2.imread, image_url)
         
         if frame is None:
             raise ValueError(f"Could not load image from: {image_url}")
         
         return frame
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error loading image: {e}")
+        logger.error("Error loading image: %s", e)
         raise HTTPException(status_code=400, detail=f"Failed to load image: {str(e)}")
 
 
-# Initialize agents (singleton pattern for demo)
+# Initialize agents (singleton pattern for demo; created at startup)
 _vision_agent: Optional[VisionAgent] = None
 _validation_agent: Optional[ValidationAgent] = None
 _event_agent: Optional[EventAgent] = None
+_frame_batcher: Optional[FrameBatcher] = None
+
+# Guards agent creation so concurrent first calls build only one instance
+_agent_lock = threading.Lock()
 
 
 def get_vision_agent() -> VisionAgent:
     """Get or create vision agent instance."""
     global _vision_agent
     if _vision_agent is None:
-        _vision_agent = VisionAgent()
+        with _agent_lock:
+            if _vision_agent is None:
+                _vision_agent = VisionAgent()
     return _vision_agent
 
 
@@ -80,7 +192,9 @@ def get_validation_agent() -> ValidationAgent:
     """Get or create validation agent instance."""
     global _validation_agent
     if _validation_agent is None:
-        _validation_agent = ValidationAgent()
+        with _agent_lock:
+            if _validation_agent is None:
+                _validation_agent = ValidationAgent()
     return _validation_agent
 
 
@@ -88,10 +202,22 @@ def get_event_agent() -> EventAgent:
     """Get or create event agent instance."""
     global _event_agent
     if _event_agent is None:
-        _event_agent = EventAgent()
+        with _agent_lock:
+            if _event_agent is None:
+                _event_agent = EventAgent()
     return _event_agent
 
 
+def get_frame_batcher() -> FrameBatcher:
+    """Get or create the batcher that groups frames from concurrent requests."""
+    global _frame_batcher
+    if _frame_batcher is None:
+        _frame_batcher = FrameBatcher(
+            lambda frames: get_vision_agent().process_frames(frames)
+        )
+    return _frame_batcher
+
+
 @router.get("/detections", response_model=List[DetectionResponse])
 def get_detections(
     limit: int = 100,
@@ -100,27 +226,39 @@ def get_detections(
 ):
     """Get all detections with pagination."""
     try:
-        detections = db.query(Detection)\
+        # Select only the response columns as plain rows (no ORM instances)
+        rows = db.query(
+            Detection.id,
+            Detection.plate_text,
+            Detection.confidence,
+            Detection.bbox_x1,
+            Detection.bbox_y1,
+            Detection.bbox_x2,
+            Detection.bbox_y2,
+            Detection.timestamp,
+            Detection.vehicle_id
+        )\
             .order_by(desc(Detection.timestamp))\
             .offset(skip)\
             .limit(limit)\
             .all()
         
-        # Convert Detection models to DetectionResponse with bbox as list
+        # Convert rows to DetectionResponse with bbox as list (model_construct
+        # skips validation; the values come straight from typed DB columns)
         result = []
-        for detection in detections:
-            result.append(DetectionResponse(
-                id=detection.id,
-                plate_text=detection.plate_text,
-                confidence=detection.confidence,
-                bbox=[detection.bbox_x1, detection.bbox_y1, detection.bbox_x2, detection.bbox_y2],
-                timestamp=detection.timestamp,
-                vehicle_id=detection.vehicle_id
+        for row in rows:
+            result.append(DetectionResponse.model_construct(
+                id=row.id,
+                plate_text=row.plate_text,
+                confidence=row.confidence,
+                bbox=[row.bbox_x1, row.bbox_y1, row.bbox_x2, row.bbox_y2],
+                timestamp=row.timestamp,
+                vehicle_id=row.vehicle_id
             ))
         
         return result
     except Exception as e:
-        logger.error(f"Error fetching detections: {e}")
+        logger.error("Error fetching detections: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -133,39 +271,108 @@ def get_events(
 ):
     """Get all events with optional filtering by event_type."""
     try:
-        query = db.query(Event).order_by(desc(Event.timestamp))
+        # Select only the response columns, with plate_text from the related
+        # detection in the same query
+        query = db.query(
+            Event.id,
+            Event.event_type,
+            Event.description,
+            Event.rule_name,
+            Event.timestamp,
+            Event.vehicle_id,
+            Detection.plate_text
+        )\
+            .outerjoin(Event.detection)\
+            .order_by(desc(Event.timestamp))
         
         if event_type:
             query = query.filter(Event.event_type == event_type)
         
-        events = query.offset(skip).limit(limit).all()
+        rows = query.offset(skip).limit(limit).all()
         
-        # Add plate_text from related detection or vehicle
         result = []
-        for event in events:
-            event_dict = {
-                "id": event.id,
-                "event_type": event.event_type,
-                "description": event.description,
-                "rule_name": event.rule_name,
-                "timestamp": event.timestamp,
-                "vehicle_id": event.vehicle_id,
-                "plate_text": None
-            }
-            
-            if event.detection_id:
-                detection = db.query(Detection).filter(Detection.id == event.detection_id).first()
-                if detection:
-                    event_dict["plate_text"] = detection.plate_text
-            
-            result.append(EventResponse(**event_dict))
+        for row in rows:
+            result.append(EventResponse.model_construct(
+                id=row.id,
+                event_type=row.event_type,
+                description=row.description,
+                rule_name=row.rule_name,
+                timestamp=row.timestamp,
+                vehicle_id=row.vehicle_id,
+                plate_text=row.plate_text
+            ))
         
         return result
     except Exception as e:
-        logger.error(f"Error fetching events: {e}")
+        logger.error("Error fetching events: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def record_detection(db: Session, vision_result: Dict) -> DetectionResponse:
+    """
+    Validate a vision result, decide its event and save both to the database.
+    
+    Blocking (database round-trips); detect_plate runs it in a worker thread.
+    
+    Args:
+        db: Database session
+        vision_result: Vision agent output (plate_text, confidence, bbox, timestamp)
+    
+    Returns:
+        The saved detection as a DetectionResponse
+    """
+    # Validate plate
+    validation_result = get_validation_agent().validate(vision_result["plate_text"])
+    
+    # Check vehicle in database
+    vehicle_info = lookup_vehicle(db, validation_result["normalized_text"])
+    vehicle_id = vehicle_info["id"] if vehicle_info else None
+    
+    # Make event decision
+    event_result = get_event_agent().decide(
+        validation_result["normalized_text"],
+        validation_result["is_valid"],
+        vehicle_info
+    )
+    
+    # Save detection to database; RETURNING hands back the new id in the
+    # same round-trip, and the rest of the row is already known locally
+    bbox = vision_result["bbox"]
+    detection_row = {
+        "vehicle_id": vehicle_id,
+        "plate_text": validation_result["normalized_text"],
+        "confidence": vision_result["confidence"],
+        "bbox_x1": bbox[0],
+        "bbox_y1": bbox[1],
+        "bbox_x2": bbox[2],
+        "bbox_y2": bbox[3],
+        "timestamp": vision_result["timestamp"]
+    }
+    detection_id = db.execute(
+        insert(Detection).returning(Detection.id), detection_row
+    ).scalar_one()
+    
+    # Save event to database
+    db.execute(insert(Event), {
+        "vehicle_id": vehicle_id,
+        "detection_id": detection_id,
+        "event_type": event_result["action"],
+        "description": event_result["description"],
+        "rule_name": event_result["rule_name"]
+    })
+    db.commit()  # Single commit for detection and event
+    
+    # Build the response from the inserted values (no reload after commit)
+    return DetectionResponse(
+        id=detection_id,
+        plate_text=detection_row["plate_text"],
+        confidence=detection_row["confidence"],
+        bbox=[bbox[0], bbox[1], bbox[2], bbox[3]],
+        timestamp=detection_row["timestamp"],
+        vehicle_id=vehicle_id
+    )
+
+
 @router.post("/detect", response_model=DetectionResponse)
 async def detect_plate(
     file: UploadFile = File(None),
@@ -181,25 +388,24 @@ async def detect_plate(
     - use_camera: Use camera (not implemented yet)
     """
     try:
-        vision_agent = get_vision_agent()
-        validation_agent = get_validation_agent()
-        event_agent = get_event_agent()
-        
         frame = None
         
         # Priority: file upload > image_url > use_camera > sample image
         if file and file.filename:
-            # Read uploaded file
-            contents = await file.read()
-            nparr = np.frombuffer(contents, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            # Read uploaded file, at most one byte past the limit so oversized
+            # uploads are rejected without buffering them entirely
+            contents = await file.read(MAX_UPLOAD_BYTES + 1)
+            if len(contents) > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="Image file too large")
+            # Decode in a worker thread so the event loop keeps serving requests
+            frame = await asyncio.to_thread(decode_image, contents)
             if frame is None:
                 raise HTTPException(status_code=400, detail="Invalid image file")
-            logger.info(f"Processing uploaded file: {file.filename}")
+            logger.info("Processing uploaded file: %s", file.filename)
         elif image_url:
             # Load from URL
-            frame = load_image(image_url)
-            logger.info(f"Processing image from URL: {image_url}")
+            frame = await load_image(image_url)
+            logger.info("Processing image from URL: %s", image_url)
         elif use_camera:
             # Camera capture (not implemented)
             raise HTTPException(status_code=501, detail="Camera capture not implemented yet")
@@ -207,7 +413,7 @@ async def detect_plate(
             # No input provided - use sample image as fallback
             sample_path = Path(__file__).parent.parent.parent / "samples" / "sample_license_plate.jpg"
             if sample_path.exists():
-                frame = cv2.imread(str(sample_path))
+                frame = await asyncio.to_thread(cv2.imread, str(sample_path))
                 logger.info("No input provided, using sample image")
             else:
                 # Fallback to mock data
@@ -216,12 +422,13 @@ async def detect_plate(
                     "plate_text": "MH12AB1234",
                     "confidence": 0.95,
                     "bbox": [100, 200, 300, 250],
-                    "timestamp": datetime.utcnow().isoformat()
+                    "timestamp": datetime.utcnow()
                 }
         
         # Process frame if we have one
         if frame is not None:
-            vision_result = vision_agent.process_frame(frame)
+            # Batched with frames from concurrent requests
+            vision_result = await get_frame_batcher().submit(frame)
             if not vision_result:
                 # Fallback to mock if detection fails
                 logger.warning("Detection failed, using mock data")
@@ -229,75 +436,19 @@ async def detect_plate(
                     "plate_text": "MH12AB1234",
                     "confidence": 0.95,
                     "bbox": [100, 200, 300, 250],
-                    "timestamp": datetime.utcnow().isoformat()
+                    "timestamp": datetime.utcnow()
                 }
         
         if not vision_result:
             raise HTTPException(status_code=404, detail="No license plate detected")
         
-        # Validate plate
-        validation_result = validation_agent.validate(vision_result["plate_text"])
-        
-        # Check vehicle in database
-        vehicle = db.query(Vehicle).filter(
-            Vehicle.plate_number == validation_result["normalized_text"]
-        ).first()
-        
-        vehicle_info = None
-        if vehicle:
-            vehicle_info = {
-                "is_authorized": vehicle.is_authorized,
-                "is_blacklisted": vehicle.is_blacklisted
-            }
-        
-        # Make event decision
-        event_result = event_agent.decide(
-            validation_result["normalized_text"],
-            validation_result["is_valid"],
-            vehicle_info
-        )
-        
-        # Save detection to database
-        bbox = vision_result["bbox"]
-        detection = Detection(
-            vehicle_id=vehicle.id if vehicle else None,
-            plate_text=validation_result["normalized_text"],
-            confidence=vision_result["confidence"],
-            bbox_x1=bbox[0],
-            bbox_y1=bbox[1],
-            bbox_x2=bbox[2],
-            bbox_y2=bbox[3],
-            timestamp=datetime.fromisoformat(vision_result["timestamp"].replace('Z', '+00:00'))
-        )
-        db.add(detection)
-        db.commit()
-        db.refresh(detection)
-        
-        # Save event to database
-        event = Event(
-            vehicle_id=vehicle.id if vehicle else None,
-            detection_id=detection.id,
-            event_type=event_result["action"],
-            description=event_result["description"],
-            rule_name=event_result["rule_name"]
-        )
-        db.add(event)
-        db.commit()
-        
-        # Convert Detection model to DetectionResponse with bbox as list
-        return DetectionResponse(
-            id=detection.id,
-            plate_text=detection.plate_text,
-            confidence=detection.confidence,
-            bbox=[detection.bbox_x1, detection.bbox_y1, detection.bbox_x2, detection.bbox_y2],
-            timestamp=detection.timestamp,
-            vehicle_id=detection.vehicle_id
-        )
+        # Database work runs in a worker thread so the event loop is not blocked
+        return await asyncio.to_thread(record_detection, db, vision_result)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error in detection endpoint: {e}")
+        logger.error("Error in detection endpoint: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -312,7 +463,17 @@ def get_alerts(
     try:
         since = datetime.utcnow() - timedelta(hours=hours)
         
-        events = db.query(Event)\
+        # Select only the response columns, with plate_text from the related
+        # detection in the same query
+        rows = db.query(
+            Event.id,
+            Event.event_type,
+            Event.description,
+            Event.rule_name,
+            Event.timestamp,
+            Detection.plate_text
+        )\
+            .outerjoin(Event.detection)\
             .filter(Event.event_type == "ALERT")\
             .filter(Event.timestamp >= since)\
             .order_by(desc(Event.timestamp))\
@@ -320,25 +481,18 @@ def get_alerts(
             .all()
         
         result = []
-        for event in events:
-            plate_text = "Unknown"
-            
-            if event.detection_id:
-                detection = db.query(Detection).filter(Detection.id == event.detection_id).first()
-                if detection:
-                    plate_text = detection.plate_text
-            
-            result.append(AlertResponse(
-                id=event.id,
-                plate_text=plate_text,
-                event_type=event.event_type,
-                description=event.description or "",
-                timestamp=event.timestamp,
-                rule_name=event.rule_name
+        for row in rows:
+            result.append(AlertResponse.model_construct(
+                id=row.id,
+                plate_text=row.plate_text or "Unknown",
+                event_type=row.event_type,
+                description=row.description or "",
+                timestamp=row.timestamp,
+                rule_name=row.rule_name
             ))
         
         return result
         
     except Exception as e:
-        logger.error(f"Error fetching alerts: {e}")
+        logger.error("Error fetching alerts: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,7 @@
 """Database access layer for ANPR system."""
 from .connection import get_db, get_db_session, init_db, engine
 from .models import Base, Vehicle, Detection, Event
+from .vehicles import lookup_vehicle
 
 __all__ = [
     "get_db",
@@ -11,4 +12,5 @@ __all__ = [
     "Vehicle",
     "Detection",
     "Event",
+    "lookup_vehicle",
 ]
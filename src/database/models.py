@@ -5,7 +5,7 @@ SQLAlchemy ORM models for vehicles, detections, and events.
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -53,6 +53,7 @@ class Detection(Base):
     
     # Relationships
     vehicle = relationship("Vehicle", back_populates="detections")
+    events = relationship("Event", back_populates="detection")
     
     def __repr__(self):
         return f"<Detection(plate_text='{self.plate_text}', confidence={self.confidence})>"
@@ -62,6 +63,11 @@ class Event(Base):
     """Event model to store system events and decisions."""
     
     __tablename__ = "events"
+    __table_args__ = (
+        # Serves the alerts query (event_type filter, newest first) as an
+        # index range scan without a separate sort
+        Index("ix_events_event_type_timestamp", "event_type", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=True, index=True)
@@ -73,6 +79,7 @@ class Event(Base):
     
     # Relationships
     vehicle = relationship("Vehicle", back_populates="events")
+    detection = relationship("Detection", back_populates="events")
     
     def __repr__(self):
         return f"<Event(event_type='{self.event_type}', timestamp='{self.timestamp}')>"
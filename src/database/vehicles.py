@@ -0,0 +1,63 @@
+"""
+Vehicle lookups by plate number.
+Optionally fronted by a short-lived in-process cache.
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .models import Vehicle
+
+# Seconds a registered vehicle's flags may be served from the cache. 0 (the
+# default) disables caching, so blacklist/authorization changes made in the
+# database apply to the very next detection. Unregistered plates are never
+# cached, so newly registered vehicles are always picked up immediately.
+VEHICLE_CACHE_TTL = float(os.getenv("VEHICLE_CACHE_TTL", 0))
+VEHICLE_CACHE_SIZE = 4096
+_vehicle_cache: Dict[str, Tuple[float, Dict]] = {}
+_vehicle_cache_lock = threading.Lock()
+
+
+def lookup_vehicle(db: Session, plate_number: str) -> Optional[Dict]:
+    """
+    Look up a registered vehicle by plate number.
+    
+    Args:
+        db: Database session
+        plate_number: Normalized plate text
+    
+    Returns:
+        Dictionary with id, is_authorized and is_blacklisted, or None if the
+        plate is not registered
+    """
+    now = time.monotonic()
+    if VEHICLE_CACHE_TTL > 0:
+        with _vehicle_cache_lock:
+            entry = _vehicle_cache.get(plate_number)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+    
+    vehicle = db.query(Vehicle.id, Vehicle.is_authorized, Vehicle.is_blacklisted)\
+        .filter(Vehicle.plate_number == plate_number)\
+        .first()
+    
+    if vehicle is None:
+        return None
+    
+    vehicle_info = {
+        "id": vehicle.id,
+        "is_authorized": vehicle.is_authorized,
+        "is_blacklisted": vehicle.is_blacklisted
+    }
+    
+    if VEHICLE_CACHE_TTL > 0:
+        with _vehicle_cache_lock:
+            if plate_number not in _vehicle_cache and len(_vehicle_cache) >= VEHICLE_CACHE_SIZE:
+                # Evict the oldest entry (dicts keep insertion order)
+                del _vehicle_cache[next(iter(_vehicle_cache))]
+            _vehicle_cache[plate_number] = (now + VEHICLE_CACHE_TTL, vehicle_info)
+    
+    return vehicle_info
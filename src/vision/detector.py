@@ -2,59 +2,218 @@
 Number plate detector using YOLOv8.
 Handles object detection for license plates.
 """
+import os
+from pathlib import Path
 from typing import List, Tuple, Optional
 import numpy as np
+import cv2
+import torch
 from ultralytics import YOLO
 
 from utils.logger import logger
 
+# Ultralytics' default cap on boxes kept per image after NMS
+MAX_DETECTIONS = 300
+
+# Model input size (longest side, px); YOLOv8's default imgsz
+INPUT_SIZE = 640
+
+# Export formats PlateDetector can convert .pt weights to, by file suffix
+EXPORT_SUFFIXES = {"onnx": ".onnx", "engine": ".engine"}
+
+# Largest batch an exported TensorRT engine accepts; matches the frame
+# batcher's BATCH_MAX_SIZE
+EXPORT_MAX_BATCH = int(os.getenv("BATCH_MAX_SIZE", 8))
+
 
 class PlateDetector:
     """YOLOv8-based license plate detector."""
     
-    def __init__(self, model_path: str = "yolov8n.pt"):
+    def __init__(self, model_path: Optional[str] = None, input_size: int = INPUT_SIZE):
         """
         Initialize the plate detector.
         
         Args:
-            model_path: Path to YOLOv8 model file (uses pretrained model by default)
+            model_path: Path to YOLOv8 model file. Defaults to the DETECTOR_MODEL
+                environment variable, else the pretrained yolov8n.pt. Exported
+                models (e.g. a TensorRT FP16 .engine or .onnx) are also accepted;
+                Ultralytics selects the inference backend from the file suffix.
+            input_size: Longest side frames are resized to for inference
         """
+        if model_path is None:
+            model_path = os.getenv("DETECTOR_MODEL", "yolov8n.pt")
+        
         try:
+            self.input_size = input_size
+            # FP16 inference; opt-in and only on CUDA, where it uses tensor
+            # cores (on CPU it is slower or unsupported)
+            self.half = (
+                os.getenv("DETECTOR_HALF", "false").lower() == "true"
+                and torch.cuda.is_available()
+            )
+            
+            # Optionally run an exported model (ONNX Runtime / TensorRT)
+            # instead of the PyTorch weights
+            export_format = os.getenv("DETECTOR_EXPORT", "").lower()
+            if export_format and model_path.endswith(".pt"):
+                model_path = self._export(model_path, export_format)
+            
             self.model = YOLO(model_path)
+            # Cleared when the model rejects a multi-frame batch (e.g. a
+            # static-shape export); detect_batch then runs frames one by one
+            self.can_batch = True
             logger.info(f"Plate detector initialized with model: {model_path}")
         except Exception as e:
             logger.error(f"Error loading YOLOv8 model: {e}")
             raise
     
-    def detect(self, frame: np.ndarray) -> List[Tuple[int, int, int, int, float]]:
+    def _export(self, model_path: str, export_format: str) -> str:
+        """
+        Export .pt weights to another inference format, once.
+        
+        The exported file is written next to the weights and reused on later
+        starts; delete it to export again (e.g. after changing input_size).
+        
+        Args:
+            model_path: Path to the YOLOv8 .pt weights
+            export_format: "onnx" (CPU-friendly) or "engine" (TensorRT, CUDA
+                only; falls back to "onnx" when CUDA is unavailable)
+        
+        Returns:
+            Path to the exported model
+        """
+        if export_format not in EXPORT_SUFFIXES:
+            raise ValueError(f"Unsupported DETECTOR_EXPORT format: {export_format}")
+        
+        if export_format == "engine" and not torch.cuda.is_available():
+            logger.warning("TensorRT export needs CUDA, which is unavailable; exporting to onnx instead")
+            export_format = "onnx"
+        
+        exported_path = Path(model_path).with_suffix(EXPORT_SUFFIXES[export_format])
+        if exported_path.exists():
+            return str(exported_path)
+        
+        logger.info("Exporting %s to %s (first start only)", model_path, export_format)
+        return YOLO(model_path).export(
+            format=export_format,
+            imgsz=self.input_size,
+            half=self.half,
+            # Dynamic batch size, so batched frames work; ONNX also gets a
+            # dynamic image shape, TensorRT engines accept 1..batch frames
+            dynamic=True,
+            batch=EXPORT_MAX_BATCH
+        )
+    
+    def detect(
+        self,
+        frame: np.ndarray,
+        max_det: int = MAX_DETECTIONS
+    ) -> List[Tuple[int, int, int, int, float]]:
         """
         Detect license plates in a frame.
         
         Args:
             frame: Input frame as NumPy array (BGR format)
+            max_det: Maximum number of boxes to keep after NMS, most
+                confident first
         
         Returns:
             List of detections as (x1, y1, x2, y2, confidence) tuples
         """
         try:
-            results = self.model(frame, verbose=False)
+            resized, scale = self._resize(frame)
+            results = self.model(
+                resized,
+                imgsz=self.input_size,
+                half=self.half,
+                max_det=max_det,
+                verbose=False
+            )
             detections = []
             
             for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        # Extract bounding box coordinates
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        confidence = float(box.conf[0].cpu().numpy())
-                        
-                        # Convert to integers
-                        x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-                        
-                        detections.append((x1, y1, x2, y2, confidence))
+                detections.extend(self._extract_boxes(result, scale))
             
             return detections
             
         except Exception as e:
             logger.error(f"Error during plate detection: {e}")
             return []
+    
+    def detect_batch(
+        self,
+        frames: List[np.ndarray],
+        max_det: int = MAX_DETECTIONS
+    ) -> List[List[Tuple[int, int, int, int, float]]]:
+        """
+        Detect license plates in several frames with a single model call.
+        
+        Falls back to one detect call per frame when the model cannot take
+        a batch (e.g. an ONNX or TensorRT export built for batch size 1).
+        
+        Args:
+            frames: Input frames as NumPy arrays (BGR format), any sizes
+            max_det: Maximum number of boxes to keep per frame after NMS
+        
+        Returns:
+            One list of (x1, y1, x2, y2, confidence) tuples per frame, in order
+        """
+        if not self.can_batch or len(frames) == 1:
+            return [self.detect(frame, max_det) for frame in frames]
+        
+        try:
+            resized = [self._resize(frame) for frame in frames]
+            results = self.model(
+                [image for image, _ in resized],
+                imgsz=self.input_size,
+                half=self.half,
+                max_det=max_det,
+                verbose=False
+            )
+            return [
+                self._extract_boxes(result, scale)
+                for result, (_, scale) in zip(results, resized)
+            ]
+            
+        except Exception as e:
+            logger.warning("Batch plate detection failed, detecting frames one by one from now on: %s", e)
+            self.can_batch = False
+            return [self.detect(frame, max_det) for frame in frames]
+    
+    def _resize(self, frame: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        Downscale a frame to the model input size (keeping aspect ratio).
+        
+        Done once here with INTER_AREA, so Ultralytics' own letterboxing
+        only pads the frame instead of resampling it a second time.
+        
+        Returns:
+            The (possibly) resized frame and the scale factor applied
+        """
+        h, w = frame.shape[:2]
+        scale = self.input_size / max(h, w)
+        if scale >= 1.0:
+            return frame, 1.0
+        
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA), scale
+    
+    @staticmethod
+    def _extract_boxes(result, scale: float = 1.0) -> List[Tuple[int, int, int, int, float]]:
+        """
+        Convert one Ultralytics result into (x1, y1, x2, y2, confidence) tuples,
+        mapping boxes on a resized frame back to original frame coordinates.
+        """
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return []
+        
+        # Move all boxes off the device in one transfer per tensor, rather
+        # than one per box, then convert to integer pixel coordinates
+        xyxy = (boxes.xyxy.cpu().numpy() / scale).astype(np.int64).tolist()
+        confidences = boxes.conf.cpu().numpy().tolist()
+        
+        return [
+            (x1, y1, x2, y2, confidence)
+            for (x1, y1, x2, y2), confidence in zip(xyxy, confidences)
+        ]
@@ -0,0 +1,50 @@
+"""
+Tests for image decoding in the API routes.
+"""
+import struct
+
+import cv2
+import numpy as np
+
+from src.backend.routes import decode_image, jpeg_orientation
+
+
+def make_jpeg(height: int = 100, width: int = 300, orientation: int = None) -> bytes:
+    """Encode a test JPEG, optionally with an EXIF Orientation tag."""
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    image[:, : width // 2] = 255
+    ok, encoded = cv2.imencode(".jpg", image)
+    assert ok
+    data = encoded.tobytes()
+    if orientation is None:
+        return data
+    
+    # Little-endian TIFF header with a one-entry IFD0: Orientation (SHORT)
+    tiff = b"II*\x00" + struct.pack("<I", 8)
+    tiff += struct.pack("<H", 1) + struct.pack("<HHIHH", 0x0112, 3, 1, orientation, 0)
+    tiff += struct.pack("<I", 0)
+    payload = b"Exif\x00\x00" + tiff
+    app1 = b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload
+    return data[:2] + app1 + data[2:]
+
+
+def test_jpeg_orientation():
+    assert jpeg_orientation(make_jpeg()) == 1
+    assert jpeg_orientation(make_jpeg(orientation=6)) == 6
+
+
+def test_decode_image_applies_exif_orientation():
+    data = make_jpeg(orientation=6)
+    expected = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    
+    frame = decode_image(data)
+    
+    assert expected.shape == (300, 100, 3)
+    assert frame.shape == expected.shape
+
+
+def test_decode_image_matches_cv2_without_orientation():
+    data = make_jpeg()
+    expected = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    
+    assert decode_image(data).shape == expected.shape == (100, 300, 3)
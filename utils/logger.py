@@ -7,16 +7,27 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
-# Create logs directory if it doesn't exist
 LOG_DIR = Path(__file__).parent.parent / "logs"
-LOG_DIR.mkdir(exist_ok=True)
 
 # Configure logging
 log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 date_format = "%Y-%m-%d %H:%M:%S"
 
-# File handler
-file_handler = logging.FileHandler(
+
+class LazyFileHandler(logging.FileHandler):
+    """File handler that creates the log directory and file on first emit."""
+    
+    def __init__(self, filename: Path):
+        super().__init__(filename, delay=True)
+    
+    def _open(self):
+        # Create logs directory if it doesn't exist
+        Path(self.baseFilename).parent.mkdir(exist_ok=True)
+        return super()._open()
+
+
+# File handler (nothing is touched on disk until the first record)
+file_handler = LazyFileHandler(
     LOG_DIR / f"anpr_{datetime.now().strftime('%Y%m%d')}.log"
 )
 file_handler.setLevel(logging.DEBUG)